@@ -5,11 +5,11 @@ No more logs rolling over, no more physical USB flash drives,
 and you can recover logs after a reboot.  Via Remote Connect!
 
 Log files will be created with filenames containing the router MAC address and timestamp.  Example:
-Log - 0030443B3877.2026-01-26 09:52:25.txt
-Log - 0030443B3877.2026-01-26 09:52:25.txt.tar.gz (after rotation)
+Log - 0030443B3877.2026-01-26 09:52:25.txt.gz
 
-When the log file reaches the maximum file size (default 10MB) it will start a new log file.
-Rotated logs are compressed to .tar.gz to save space.
+Logs are compressed as they are written to save space and flash wear: .gz, or .zst if the zstandard
+module is bundled with the app.  The log being written is flushed every second and can be read while open.
+When the log file reaches the maximum file size (default 10MB, uncompressed) it will start a new log file.
 When the total size of log files exceeds the maximum storage (default 50MB) it will delete the oldest logs.
 
 Settings can be configured via /config/system/sdk/appdata:
@@ -22,125 +22,555 @@ Or forward the LAN zone to the ROUTER zone for local access on http://{ROUTER IP
 """
 
 import cp
-from subprocess import Popen, PIPE
-import datetime
+import ctypes
+import errno
+import functools
+import gzip
+import mmap
+import shutil
+import struct
 import time
 import os
-import tarfile
+import re
+import select
+import heapq
+import inspect
+import threading
+import zlib
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
 
 MB = 2**20
 
+LOG_DIR = 'logs'
+LOG_PREFIX = LOG_DIR + os.sep
+
+# write batch size and how often (seconds) batched log data is written and synced to flash
+WRITE_BUFFER_SIZE = 64 * 1024
+SYNC_INTERVAL = 1.0
+DIRECT_IO_ALIGNMENT = 4096
+
+SYSLOG_PATH = '/var/log/messages'
+READ_SIZE = 64 * 1024
+
+# inotify event masks, from linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVE_SELF = 0x00000800
+IN_DELETE_SELF = 0x00000400
+INOTIFY_EVENT = struct.Struct('iIII')
+
+# epoch timestamp at the start of a syslog line, capturing whole seconds.  Only lines starting with a
+# digit can match, and at most 10 digits keeps out numbers too large to be a timestamp.
+EPOCH = re.compile(rb'^(\d{1,10})(?:\.\d*)? ', re.M)
+
+# how often (seconds) the background thread rotates log files
+MAINTENANCE_INTERVAL = 30
+
+# backoff (seconds) before retrying after logging fails, doubling up to the max while the same error repeats,
+# and how many repeats of the same error raise an NCM alert
+RETRY_DELAY = 1
+MAX_RETRY_DELAY = 60
+ALERT_AFTER_FAILURES = 5
+
 # default values
 DEFAULT_MAX_FILE_SIZE_MB = 10
 DEFAULT_MAX_TOTAL_STORAGE_MB = 50
 
+# In-memory index of the files in the logs folder, so rotation doesn't re-stat every file each pass.
+# log_index maps filename -> (mtime, size); log_heap is a min-heap of (mtime, filename).
+# Heap entries whose mtime no longer matches log_index are stale and skipped when popped.
+# index_lock guards both, and active_log, the file write_logs() is writing, which rotation never deletes.
+log_index = {}
+log_heap = []
+active_log = None
+index_lock = threading.Lock()
+
+# monotonic time write_logs() last synced log data to flash, so main() can tell whether a failed pass made progress
+last_log_sync = 0.0
+
 # Get config values from appdata, or use defaults
 #
 # To override, go to: Router/Group page -> Configuration -> Edit -> System -> SDK Data
 # Add fields for:
 #   `logfile_max_file_size_MB`
 #   `logfile_max_total_storage_MB`
-def get_config_value(key, default):
-    """Get a config value from sdk/appdata, or return the default."""
+def get_config_values(keys):
+    """Get config values for a dict of {key: default} from sdk/appdata in one request, using defaults where unset."""
     try:
-        appdata = cp.get('/config/system/sdk/appdata')
-        if appdata:
-            for item in appdata:
-                if item.get('name') == key:
-                    value = item.get('value')
-                    if value:
-                        return float(value)
-        return default
+        appdata = cp.get('/config/system/sdk/appdata') or []
+        index = {item.get('name'): item.get('value') for item in appdata if isinstance(item, dict)}
     except Exception as e:
-        cp.log(f'Error reading config {key}: {e}')
-        return default
+        cp.log(f'Error reading config: {e}')
+        index = {}
+    values = {}
+    for key, default in keys.items():
+        values[key] = default
+        value = index.get(key)
+        if value:
+            try:
+                values[key] = float(value)
+            except (TypeError, ValueError) as e:
+                cp.log(f'Error reading config {key}: {e}')
+    return values
+
+def index_file(filename, st=None):
+    """Add or update a file in the log index, using st if already stat'ed."""
+    if st is None:
+        st = os.stat(LOG_PREFIX + filename)
+    with index_lock:
+        log_index[filename] = (st.st_mtime, st.st_size)
+        heapq.heappush(log_heap, (st.st_mtime, filename))
+
+def update_index_size(filename, size):
+    """Update the size of an indexed file that is still being written, keeping its place in the heap."""
+    with index_lock:
+        if filename in log_index:
+            log_index[filename] = (log_index[filename][0], size)
+
+def unindex_file(filename):
+    """Remove a file from the log index.  Its heap entry is discarded lazily."""
+    with index_lock:
+        log_index.pop(filename, None)
+
+def build_index():
+    """Rebuild the log index from the logs folder.  Only needed at startup."""
+    with index_lock:
+        log_index.clear()
+        log_heap.clear()
+    with os.scandir(LOG_DIR) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False):
+                index_file(entry.name, entry.stat())
+
+def log_compressor():
+    """Return (extension, compressor, sync flush mode, finish flush mode) for streaming log compression."""
+    if zstd:
+        cobj = zstd.ZstdCompressor(level=3).compressobj()
+        return '.zst', cobj, zstd.COMPRESSOBJ_FLUSH_BLOCK, zstd.COMPRESSOBJ_FLUSH_FINISH
+    # wbits 31 selects the gzip container; a low level keeps per-line CPU down on the router
+    return '.gz', zlib.compressobj(3, zlib.DEFLATED, 31), zlib.Z_SYNC_FLUSH, zlib.Z_FINISH
+
+def sync_dir(path):
+    """Sync a directory so entries just created in it survive a power cut.  fdatasync on a file doesn't do this."""
+    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def create_exclusive(path, ext, flags=os.O_WRONLY):
+    """Atomically create path + ext, or path.000 + ext, path.001 + ext, ... if taken.  Returns (fd, created path)."""
+    i = 0
+    while True:
+        candidate = f'{path}{ext}' if i == 0 else f'{path}.{i - 1:03d}{ext}'
+        try:
+            fd = os.open(candidate, flags | os.O_CREAT | os.O_EXCL | os.O_CLOEXEC, 0o644)
+            break
+        except FileExistsError:
+            i += 1
+    try:
+        sync_dir(os.path.dirname(candidate) or '.')
+    except OSError:
+        os.close(fd)
+        os.remove(candidate)
+        raise
+    return fd, candidate
+
+def drop_cache(fd):
+    """Tell the kernel fd's cached pages won't be needed again, freeing page cache on the router."""
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
 
 def compress_files():
-    # find any .txt file and compress it
-    logfiles = [f for f in os.listdir('logs') if f.endswith('.txt') and os.path.isfile(os.path.join('logs', f))]
-    for logfile in logfiles:
-        path = os.path.join('logs', logfile)
+    # find any uncompressed .txt file, left by older versions of this app, and compress it
+    with os.scandir(LOG_DIR) as it:
+        entries = [e for e in it if e.name.endswith('.txt') and e.is_file(follow_symlinks=False)]
+    for entry in entries:
+        logfile = entry.name
+        path = entry.path
+        archive_path = None
         try:
-            original_mtime = os.path.getmtime(path)
+            original_mtime = entry.stat().st_mtime
 
-            # target compressed is to add .tar.gz, but add file indexing if needed to deconflict
-            tarball_path = f'{path}.tar.gz'
-            if os.path.exists(tarball_path):
-                i = 0
-                while True:
-                    tarball_path = f'{path}.{i:03d}.tar.gz'
-                    if not os.path.exists(tarball_path):
-                        break
-                    i += 1
+            # target compressed is to add .zst or .gz, but add file indexing if needed to deconflict
+            ext = '.zst' if zstd else '.gz'
+            fd, archive_path = create_exclusive(path, ext)
 
-            with tarfile.open(tarball_path, 'w:gz') as tar:
-                tar.add(path, arcname=os.path.basename(path))
+            # compress the single file directly, no tar wrapper needed
+            with open(path, 'rb') as src, open(fd, 'wb') as dst:
+                if zstd:
+                    zstd.ZstdCompressor(level=3, threads=-1).copy_stream(src, dst, size=entry.stat().st_size)
+                else:
+                    with gzip.GzipFile(filename=archive_path, fileobj=dst, mode='wb', compresslevel=6,
+                                       mtime=original_mtime) as gz:
+                        shutil.copyfileobj(src, gz, READ_SIZE)
 
-            # update modified time on the tar file to preserve notion of "oldest"
-            os.utime(tarball_path, (original_mtime, original_mtime))
+                # only clean pages can be dropped, so sync the archive first
+                dst.flush()
+                os.fdatasync(dst.fileno())
+                drop_cache(dst.fileno())
+                drop_cache(src.fileno())
+
+            # update modified time on the archive to preserve notion of "oldest"
+            os.utime(archive_path, (original_mtime, original_mtime))
 
             # remove original file
             os.remove(path)
+            unindex_file(logfile)
+            index_file(os.path.basename(archive_path))
         except Exception as e:
             cp.log(f'Compression failed for {logfile}: {e}')
-            if os.path.exists(tarball_path):
-                os.remove(tarball_path)
-
-def write_logs(mac, max_file_size):
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    logfile = f'Log - {mac} {timestamp}.txt'
-    logpath = os.path.join('logs', logfile)
-    f = open(logpath, 'wt')
+            if archive_path and os.path.exists(archive_path):
+                os.remove(archive_path)
+
+class LogWriter:
+    """Log file writer that batches lines in memory and writes them out in large, synced chunks.
+
+    Every flush is durable: on Linux each pwritev() carries RWF_DSYNC so the write and the data sync
+    happen together, otherwise it falls back to pwrite() followed by fdatasync().
+
+    Where the filesystem supports it, whole blocks are written with O_DIRECT from a page-aligned buffer
+    so log data doesn't fill the page cache.  The partial block left at the end of a flush goes through
+    a regular fd and stays in the buffer, to be rewritten by the next direct write once it fills.
+    """
+
+    def __init__(self, fd, path):
+        self.fd = fd
+        # anonymous mmap is page aligned, as O_DIRECT requires.  Allocated before opening anything
+        # so a failure here leaves only fd, which the caller owns, to clean up
+        self.buffer = mmap.mmap(-1, WRITE_BUFFER_SIZE)
+        self.view = memoryview(self.buffer)
+        self.direct_fd = None
+        if hasattr(os, 'O_DIRECT'):
+            try:
+                self.direct_fd = os.open(path, os.O_WRONLY | os.O_CLOEXEC | os.O_DIRECT)
+            except OSError:
+                pass  # filesystem doesn't support O_DIRECT
+        self.offset = 0    # file offset of the start of the buffer
+        self.fill = 0      # bytes in the buffer
+        self.written = 0   # bytes at the start of the buffer already written through self.fd
+        self.dsync_writes = hasattr(os, 'pwritev') and hasattr(os, 'RWF_DSYNC')
+
+    def write(self, data):
+        data = memoryview(data)
+        while data:
+            n = min(len(data), WRITE_BUFFER_SIZE - self.fill)
+            self.view[self.fill:self.fill + n] = data[:n]
+            self.fill += n
+            data = data[n:]
+            if self.fill == WRITE_BUFFER_SIZE:
+                self.flush()
+
+    def tell(self):
+        return self.offset + self.fill
+
+    def _pwrite(self, fd, start, end, offset):
+        """Write self.view[start:end] at offset.  Each slice is released as soon as it's used, so a failed
+        write's traceback doesn't keep the mmap exported and stop close() from freeing it."""
+        while start < end:
+            with self.view[start:end] as data:
+                if self.dsync_writes:
+                    try:
+                        n = os.pwritev(fd, [data], offset, os.RWF_DSYNC)
+                    except OSError as e:
+                        # kernel too old for per-write flags.  Only the regular fd can tell us that: the O_DIRECT
+                        # fd also returns EINVAL when the filesystem rejects direct writes, handled in flush()
+                        if fd != self.fd or e.errno not in (errno.EINVAL, errno.EOPNOTSUPP):
+                            raise
+                        self.dsync_writes = False
+                        continue
+                else:
+                    n = os.pwrite(fd, data, offset)
+            start += n
+            offset += n
+
+    def flush(self):
+        """Write out and sync everything pending."""
+        if self.fill == self.written:
+            return
+        aligned = 0
+        if self.direct_fd is not None:
+            aligned = self.fill - self.fill % DIRECT_IO_ALIGNMENT
+            if aligned:
+                try:
+                    self._pwrite(self.direct_fd, 0, aligned, self.offset)
+                except OSError as e:
+                    # filesystem accepted O_DIRECT at open but not for writes
+                    if e.errno != errno.EINVAL:
+                        raise
+                    os.close(self.direct_fd)
+                    self.direct_fd = None
+                    aligned = 0
+        start = max(aligned, self.written)
+        if start < self.fill:
+            self._pwrite(self.fd, start, self.fill, self.offset + start)
+        if not self.dsync_writes:
+            if hasattr(os, 'fdatasync'):
+                os.fdatasync(self.fd)
+            else:
+                os.fsync(self.fd)
+
+        # keep the partial block at the front of the buffer for the next direct write
+        keep = self.fill - aligned if self.direct_fd is not None else 0
+        if keep and aligned:
+            self.view[:keep] = self.view[aligned:self.fill]
+        self.offset += self.fill - keep
+        self.fill = self.written = keep
+
+    def close(self):
+        if self.fd is None:
+            return
+        try:
+            self.flush()
+        finally:
+            os.close(self.fd)
+            if self.direct_fd is not None:
+                os.close(self.direct_fd)
+            self.fd = self.direct_fd = None
+            try:
+                self.view.release()
+                self.buffer.close()
+            except BufferError:
+                pass  # still referenced elsewhere, freed with the last reference; don't mask a write error
+
+def follow_log(path, timeout=None):
+    """Yield blocks of complete lines (bytes) as they are appended to path, following it across rotation like `tail -F`.
+
+    Uses inotify directly so no tail subprocess or polling is needed.  If timeout is set, an empty block is
+    yielded whenever nothing new arrives for timeout seconds, so the caller can do periodic work.
+    """
+    libc = ctypes.CDLL(None, use_errno=True)
+    inotify_fd = libc.inotify_init1(os.O_CLOEXEC)
+    if inotify_fd < 0:
+        raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+    fd = None
+    try:
+        reopened = False
+        while True:
+            # (re)open the log, waiting for it to reappear if it was rotated away
+            while True:
+                try:
+                    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+                    break
+                except FileNotFoundError:
+                    time.sleep(1)
+            wd = libc.inotify_add_watch(inotify_fd, os.fsencode(path),
+                                        IN_MODIFY | IN_ATTRIB | IN_MOVE_SELF | IN_DELETE_SELF)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {path}')
+            # start at the end of the log, or the beginning of a newly rotated one
+            pos = 0 if reopened else os.lseek(fd, 0, os.SEEK_END)
+            residual = b''
+            gone = False
+            while not gone:
+                if not select.select([inotify_fd], [], [], timeout)[0]:
+                    yield b''
+                    continue
+                mask = 0
+                events = os.read(inotify_fd, 4096)
+                offset = 0
+                while offset < len(events):
+                    _, event_mask, _, name_len = INOTIFY_EVENT.unpack_from(events, offset)
+                    mask |= event_mask
+                    offset += INOTIFY_EVENT.size + name_len
+                if mask & (IN_MOVE_SELF | IN_DELETE_SELF):
+                    gone = True
+                elif mask & IN_ATTRIB and os.fstat(fd).st_nlink == 0:
+                    gone = True
+                # log was truncated in place, start over from the beginning
+                if os.fstat(fd).st_size < pos:
+                    pos = os.lseek(fd, 0, os.SEEK_SET)
+                    residual = b''
+                while True:
+                    data = os.read(fd, READ_SIZE)
+                    if not data:
+                        break
+                    pos += len(data)
+                    data = residual + data
+                    end = data.rfind(b'\n') + 1
+                    residual = data[end:]
+                    if end:
+                        yield data[:end]
+            libc.inotify_rm_watch(inotify_fd, wd)
+            os.close(fd)
+            fd = None
+            reopened = True
+    finally:
+        if fd is not None:
+            os.close(fd)
+        os.close(inotify_fd)
+
+@functools.lru_cache(maxsize=1)
+def format_second(second):
+    """Format an epoch second as a readable date.  Cached since consecutive syslog lines usually share a second."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second)).encode()
+
+def rewrite_epoch(match):
+    """re.sub callback replacing a line's epoch timestamp with a readable date."""
     try:
-        cmd = ['/usr/bin/tail', '/var/log/messages', '-n1', '-F']
-        tail = Popen(cmd, stdout=PIPE, stderr=PIPE)
-        for line in iter(tail.stdout.readline, ''):
-            if tail.returncode:
-                break
-            line = line.decode('utf-8').split(' ')
+        return format_second(int(match.group(1))) + b' '
+    except (OverflowError, OSError):
+        # past the platform's time_t range
+        return match.group(0)
+
+def write_logs(mac, max_file_size, lines):
+    """Write lines to a new compressed log file until max_file_size uncompressed bytes.
+
+    The file is only created once there is something to write.  Returns True on size rotation; errors
+    from following syslog or writing are raised to the caller once the file is closed.
+    """
+    global active_log, last_log_sync
+    f = None
+    size = 0
+    last_sync = time.monotonic()
+    pending = False
+    try:
+        for block in lines:
+            if block:
+                if f is None:
+                    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+                    ext, compressor, sync_mode, finish_mode = log_compressor()
+                    fd, logpath = create_exclusive(f'{LOG_PREFIX}Log - {mac} {timestamp}.txt', ext)
+                    logfile = os.path.basename(logpath)
+                    try:
+                        f = LogWriter(fd, logpath)
+                    except BaseException:
+                        os.close(fd)
+                        os.remove(logpath)
+                        raise
+                    with index_lock:
+                        active_log = logfile
+                    index_file(logfile)
+                # rewrite the leading epoch timestamps, if any, as readable dates
+                block = EPOCH.sub(rewrite_epoch, block)
+                f.write(compressor.compress(block))
+                size += len(block)
+                pending = True
+            now = time.monotonic()
+            if pending and now - last_sync > SYNC_INTERVAL:
+                # flush the compressor too so everything so far can be decompressed from the file
+                f.write(compressor.flush(sync_mode))
+                f.flush()
+                update_index_size(logfile, f.tell())
+                last_sync = last_log_sync = now
+                pending = False
+            if size > max_file_size:
+                return True
+        return False
+    finally:
+        if f is not None:
+            # log, don't raise, errors finishing the file so they can't replace the error that got us here
             try:
-                line[0] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(float(line[0])))
-            except:
-                pass
-            line = ' '.join(line)
-            f.write(line)
-            f.flush()
-            os.sync()
-            if f.tell() > max_file_size:
-                f.close()
-                time.sleep(1)
-                return
-    except Exception as e:
-        cp.log(f'Exception! {e}')
+                try:
+                    f.write(compressor.flush(finish_mode))
+                finally:
+                    f.close()
+            except Exception as e:
+                cp.log(f'Error closing {logfile}: {e}')
+            finally:
+                # always release the file to rotation, whatever happened above
+                with index_lock:
+                    active_log = None
+                try:
+                    st = os.stat(logpath)
+                    if st.st_size:
+                        index_file(logfile, st)
+                    else:
+                        # nothing reached flash, don't leave an empty file behind for every failed retry
+                        os.remove(logpath)
+                        unindex_file(logfile)
+                except OSError:
+                    unindex_file(logfile)
 
 def rotate_files(max_total_storage):
-    # get all files in log folder, sort by modify time (oldest first), and calculate total size
-    logfiles = [f for f in os.listdir('logs') if os.path.isfile(os.path.join('logs', f))]
-    logfiles = sorted(logfiles, key=lambda f: os.path.getmtime(os.path.join('logs', f)), reverse=True)
-    total_size = sum(os.path.getsize(os.path.join('logs', f)) for f in logfiles)
-
-    # iteratively delete oldest file until total size is under max
-    while total_size > max_total_storage and logfiles:
-        oldest = logfiles.pop()
-        oldest_path = os.path.join('logs', oldest)
-        total_size -= os.path.getsize(oldest_path)
-        os.remove(oldest_path)
+    with index_lock:
+        # total size of all indexed log files
+        total_size = sum(size for _, size in log_index.values())
+
+        # iteratively delete oldest file until total size is under max, never the one being written
+        skipped = []
+        try:
+            while total_size > max_total_storage and log_heap:
+                mtime, oldest = heapq.heappop(log_heap)
+                entry = log_index.get(oldest)
+                if entry is None or entry[0] != mtime:
+                    continue
+                if oldest == active_log:
+                    skipped.append((mtime, oldest))
+                    continue
+                total_size -= entry[1]
+                del log_index[oldest]
+                try:
+                    os.remove(LOG_PREFIX + oldest)
+                except FileNotFoundError:
+                    pass  # already gone, just drop it from the index
+        finally:
+            for item in skipped:
+                heapq.heappush(log_heap, item)
+
+def maintenance(max_total_storage):
+    """Background loop deleting the oldest logs when over max_total_storage."""
+    # uncompressed logs can only be left over from older versions, so they only need compressing once
+    try:
+        compress_files()
+    except Exception as e:
+        cp.log(f'Log maintenance failed: {e}')
+    while True:
+        try:
+            rotate_files(max_total_storage)
+        except Exception as e:
+            cp.log(f'Log maintenance failed: {e}')
+        time.sleep(MAINTENANCE_INTERVAL)
 
 def main():
     cp.log(f'Starting logfile; download logs via NCM LAN Manager - HTTP 127.0.0.1 port 8000')
 
-    max_file_size = get_config_value('logfile_max_file_size_MB', DEFAULT_MAX_FILE_SIZE_MB) * MB
-    max_total_storage = get_config_value('logfile_max_total_storage_MB', DEFAULT_MAX_TOTAL_STORAGE_MB) * MB
+    config = get_config_values({
+        'logfile_max_file_size_MB': DEFAULT_MAX_FILE_SIZE_MB,
+        'logfile_max_total_storage_MB': DEFAULT_MAX_TOTAL_STORAGE_MB,
+    })
+    max_file_size = config['logfile_max_file_size_MB'] * MB
+    max_total_storage = config['logfile_max_total_storage_MB'] * MB
     cp.log(f'Max log file size: {max_file_size/MB}MB, Max total log storage: {max_total_storage/MB}MB')
 
     mac = cp.get('status/product_info/mac0').replace(':', '').upper()
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
+    if not os.path.exists(LOG_DIR):
+        os.makedirs(LOG_DIR)
+    build_index()
+    threading.Thread(target=maintenance, args=(max_total_storage,), daemon=True).start()
 
+    # wake up when syslog is idle so the last lines written still get flushed on time
+    lines = follow_log(SYSLOG_PATH, SYNC_INTERVAL / 2)
+    failures = 0
+    last_error = None
     while True:
-        compress_files()
-        rotate_files(max_total_storage)
-        write_logs(mac, max_file_size)
+        started = time.monotonic()
+        try:
+            if write_logs(mac, max_file_size, lines):
+                failures = 0
+                continue
+            error = 'following syslog stopped'
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+
+        # back off before starting over, and escalate if the same error keeps coming back without any
+        # log data getting written in between
+        if last_log_sync > started:
+            failures = 0
+        failures = failures + 1 if error == last_error else 1
+        last_error = error
+        delay = min(RETRY_DELAY * 2 ** min(failures - 1, 6), MAX_RETRY_DELAY)
+        cp.log(f'Exception! {error}, retrying in {delay}s')
+        if failures == ALERT_AFTER_FAILURES:
+            cp.alert(f'logfile: logging to flash keeps failing: {error}')
+        time.sleep(delay)
+        # a writer error leaves the follower suspended where it was, so resume from it and lose nothing;
+        # only start a new one if the follower itself failed
+        if inspect.getgeneratorstate(lines) == inspect.GEN_CLOSED:
+            lines = follow_log(SYSLOG_PATH, SYNC_INTERVAL / 2)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file